@@ -4,13 +4,19 @@
 
 # -- # Imports # ----------------------------------------------------------------------------------------------------- #
 # Python
-import argparse as ap  # Python version 3.2
 import atexit
-import enum
+import collections
+import concurrent.futures as cf  # Python version 3.2
+import contextlib
+import itertools as it
+import mmap
+import os
 import pathlib as pl  # Python version 3.4
+import stat
 import sys
+import types
+import typing as tp
 # Project
-import unpacker
 import windows.dialog
 import windows.terminal
 
@@ -40,38 +46,199 @@ _TC_MAGENTA = "\x1B[35m"
 _TC_CYAN = "\x1B[36m"
 _TC_WHITE = "\x1B[37m"
 
+# # Progress bar, with every possible line built in advance.
+_PROGRESS_WIDTH = 30
+_PROGRESS_BARS = tuple(
+    f"""\rProgress: [{("#" * _).ljust(_PROGRESS_WIDTH, " ")}]""" for _ in range(_PROGRESS_WIDTH + 1)
+)
 
-# -- # Enumerations # ------------------------------------------------------------------------------------------------ #
-class Action(enum.IntEnum):
-    UNPACK = 1, ".bmp"
-    PACK = 2, ".bin"
+# # File processing in parallel.
+_PARALLEL_MIN_FILES = 4
+_PARALLEL_CHUNK_SIZE = 8
+_PARALLEL_MAX_PENDING = 64
 
-    # Enum construction with additional fields.
-    def __new__(cls, value: int, *_):
-        obj = int.__new__(cls, value)
-        obj._value_ = value
-        return obj
 
-    def __init__(self, _, extension: str) -> None:
+# -- # Classes # ----------------------------------------------------------------------------------------------------- #
+class Action:
+    """The ways in which the program can process files.
+
+    There is a single instance for each action, available as class attributes, so actions are compared by identity.
+    """
+    UNPACK: "Action"
+    PACK: "Action"
+
+    __slots__ = ('value', 'name', 'extension')
+
+    # -- # Constructor # --------------------------------------------------------------------------------------------- #
+    def __init__(self, value: int, name: str, extension: str) -> None:
+        self.value: int = value
+        self.name: str = name
         self.extension: str = extension
 
     # -- # Magic Methods # ------------------------------------------------------------------------------------------- #
     def __str__(self) -> str:
         return self.name.lower().capitalize()
 
+    def __reduce__(self):
+        # Pickled by reference for worker processes, so the same instance is obtained.
+        return getattr, (Action, self.name)
+
+
+Action.UNPACK = Action(1, 'UNPACK', ".bmp")
+Action.PACK = Action(2, 'PACK', ".bin")
+
+_ACTIONS_BY_VALUE: dict[int, Action] = {_.value: _ for _ in (Action.UNPACK, Action.PACK)}
+
 
 # -- # Functions # --------------------------------------------------------------------------------------------------- #
 def make_os_err_msg(error: OSError) -> str:
-    """Auxiliary function that creates customized error messages from OS errors."""
-    if hasattr(ex, 'winerror'):
-        return f"""Windows Error #{ error.winerror } - { error.strerror }."""
+    """Auxiliary function that creates customized error messages from OS errors, without ending punctuation."""
+    winerror = getattr(error, 'winerror', None)
+
+    if winerror is not None:
+        return f"""Windows Error #{ winerror } - { error.strerror }"""
     else:
-        return f"""System Error #{ error.errno } - { error.strerror }."""
+        return f"""System Error #{ error.errno } - { error.strerror }"""
+
+
+def scan_files(
+        directory: str | os.PathLike,
+        on_error: tp.Callable[[str, OSError], None] | None = None
+) -> tp.Iterator[os.DirEntry]:
+    """Auxiliary generator that yields the entries of all regular files inside a directory, ignoring symbolic links.
+
+    Entries are obtained through os.scandir, whose cached file type information spares one system call per entry.
+    Entries that cannot be checked are skipped, and if on_error is given, it's called with their path and the error.
+    """
+    with os.scandir(directory) as entries:  # Python version 3.6
+        for entry in entries:
+            try:
+                if not entry.is_symlink() and entry.is_file(follow_symlinks=False):
+                    yield entry
+            except FileNotFoundError:
+                # Entry was removed while scanning.
+                continue
+            except OSError as ex:
+                if on_error is not None:
+                    on_error(entry.path, ex)
+
+
+def scan_names(directory: str) -> set[str]:
+    """Auxiliary function that lists the names of all entries inside a directory, normalized for case-insensitive file
+    systems, through a single os.scandir call."""
+    with os.scandir(directory) as entries:
+        return set(os.path.normcase(entry.name) for entry in entries)
+
+
+@contextlib.contextmanager
+def map_file(path: str | os.PathLike) -> tp.Iterator[mmap.mmap | bytes]:
+    """Auxiliary context manager that maps a file into memory for reading, instead of copying its whole contents.
+
+    Empty files cannot be mapped, so empty bytes are given for them instead.
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b''
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+                yield file_map
+
+
+def process_file(input_file: str, output_file: str, action: Action, overwrite: bool) -> str | None:
+    """Auxiliary function that unpacks or packs a single file and saves the result.
+
+    This runs in worker processes, so instead of raising, errors are returned as the message they are displayed under,
+    and None is returned on success.
+    """
+    # Worker processes do not run the script, so the module is imported here instead.
+    import unpacker
+
+    try:
+        try:
+            # The input file is read from a memory map, and released before the output file is written.
+            with map_file(input_file) as input_data:
+                output_data = (
+                    unpacker.unpack(resource_data=input_data)
+                    if action is Action.UNPACK else
+                    unpacker.pack(bitmap_data=input_data)
+                )
+        except unpacker.UnpackerError as ex:
+            return f"""Un/Packer Error - {str(ex)}:"""
+
+        # Unless overwriting, the file is created exclusively, so the OS refuses files created since they were queued.
+        with open(output_file, 'wb' if overwrite else 'xb') as output_stream:
+            output_stream.write(output_data)
+    except FileExistsError:
+        return "Error - A file already exists at the target location:"
+    except OSError as ex:
+        return make_os_err_msg(ex) + ":"
+
+    return None
+
+
+def map_chunk(function: tp.Callable, chunk: list[tuple]) -> list:
+    """Auxiliary function that calls a function once for each tuple of arguments in a chunk, within a single task."""
+    return [function(*args) for args in chunk]
+
+
+def map_in_pool(
+        pool: cf.Executor,
+        function: tp.Callable,
+        args_iterable: tp.Iterable[tuple],
+        chunk_size: int,
+        max_pending: int
+) -> tp.Iterator:
+    """Auxiliary generator that works like Executor.starmap would, yielding results in order, but submits chunks of
+    arguments lazily instead of all at once.
+
+    At most max_pending chunks are submitted at any time, so memory use does not grow with the number of arguments, and
+    results start being consumed while the remaining arguments are still being produced.
+    """
+    pending: collections.deque[cf.Future] = collections.deque()
+    args_iterator = iter(args_iterable)
+
+    while chunk := list(it.islice(args_iterator, chunk_size)):  # Python version 3.8
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+
+        pending.append(pool.submit(map_chunk, function, chunk))
+
+    while pending:
+        yield from pending.popleft().result()
+
+
+def exit_with(code: int, *lines: str) -> tp.NoReturn:
+    """Auxiliary function that writes any given lines to the standard output as a single block, then exits the program
+    with the given code."""
+    if len(lines) > 0:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    sys.exit(code)
 
 
 # -- # Script # ------------------------------------------------------------------------------------------------------ #
 if __name__ == '__main__':
     # -- # Preparation # --------------------------------------------------------------------------------------------- #
+    # Answer version requests right away, without setting up the command-line parser.
+    if sys.argv[1:] in (['-v'], ['--version']):
+        print(f"""{ PROGRAM_NAME } v{ PROGRAM_VER }""")
+        sys.exit(0)
+
+    # Heavier modules are only imported when they are needed.
+    # # The Un/packer is imported once the action is known, since it also loads the Pillow library when available.
+    import argparse as ap  # Python version 3.2
+
+    # Terminal output is only flushed once a block of text is complete, not on every line.
+    # # Interactive terminals are line-buffered by default, and on Windows each flushed line is a slow console write.
+    # # Prompts through input() flush on their own.
+    out = sys.stdout
+
+    try:
+        out.reconfigure(line_buffering=False, write_through=False)  # Python version 3.7
+    except AttributeError:
+        # Standard output was replaced by something other than a text file.
+        pass
+
     # Do not print anything until the startup message has been displayed.
     print_queue: list[str] = list()
 
@@ -143,11 +310,6 @@ if __name__ == '__main__':
     opt_colors: bool = args['colors']
     ansi_enabled: bool = False
 
-    # # # Define colored output printing mechanism.
-    def a(text: str) -> str:
-        """Shortcut to display or hide text based on ANSI Virtual Terminal Sequences being enabled."""
-        return text if ansi_enabled else ""
-
     if opt_colors:
         try:
             terminal_lib = windows.terminal.TerminalLib()
@@ -190,20 +352,35 @@ if __name__ == '__main__':
             else:
                 ansi_enabled = True
 
-                print_queue.append(" ".join((
-                    "Colors enabled!   ",
-                    a(_TF_BOLD) + "Bold" + a(_T_RESET),
-                    a(_TF_UNDER) + "Underlined" + a(_T_RESET),
-                    a(_TF_NEG) + "Negative" + a(_T_RESET),
-                    a(_TC_WHITE) + "White" + a(_T_RESET),
-                    a(_TC_RED) + "Red" + a(_T_RESET),
-                    a(_TC_GREEN) + "Green" + a(_T_RESET),
-                    a(_TC_BLUE) + "Blue" + a(_T_RESET),
-                    a(_TC_CYAN) + "Cyan" + a(_T_RESET),
-                    a(_TC_YELLOW) + "Yellow" + a(_T_RESET),
-                    a(_TC_MAGENTA) + "Magenta" + a(_T_RESET),
-                    a(_TC_BLACK) + "Black" + a(_T_RESET)
-                )))
+    # # # Define colored output printing mechanism.
+    # # # # Codes are resolved once, and are empty strings when ANSI Virtual Terminal Sequences are disabled.
+    # # # # They are interned, so every message formats the same string objects.
+    C = types.SimpleNamespace(**{
+        name: sys.intern(code if ansi_enabled else "")
+        for name, code in (
+            ('RESET', _T_RESET),
+            ('BOLD', _TF_BOLD), ('UNDER', _TF_UNDER), ('NEG', _TF_NEG),
+            ('NO_BOLD', _TF_NO_BOLD), ('NO_UNDER', _TF_NO_UNDER), ('NO_NEG', _TF_NO_NEG),
+            ('BLACK', _TC_BLACK), ('RED', _TC_RED), ('GREEN', _TC_GREEN), ('YELLOW', _TC_YELLOW),
+            ('BLUE', _TC_BLUE), ('MAGENTA', _TC_MAGENTA), ('CYAN', _TC_CYAN), ('WHITE', _TC_WHITE)
+        )
+    })
+
+    if ansi_enabled:
+        print_queue.append(" ".join((
+            "Colors enabled!   ",
+            f"""{C.BOLD}Bold{C.RESET}""",
+            f"""{C.UNDER}Underlined{C.RESET}""",
+            f"""{C.NEG}Negative{C.RESET}""",
+            f"""{C.WHITE}White{C.RESET}""",
+            f"""{C.RED}Red{C.RESET}""",
+            f"""{C.GREEN}Green{C.RESET}""",
+            f"""{C.BLUE}Blue{C.RESET}""",
+            f"""{C.CYAN}Cyan{C.RESET}""",
+            f"""{C.YELLOW}Yellow{C.RESET}""",
+            f"""{C.MAGENTA}Magenta{C.RESET}""",
+            f"""{C.BLACK}Black{C.RESET}"""
+        )))
 
     # # Enable interactive mode.
     opt_interactive: bool = args['interactive']
@@ -215,44 +392,44 @@ if __name__ == '__main__':
         except windows.dialog.DialogLibError as ex:
             if windows.OS_IS_WINDOWS:
                 print_queue.append(
-                    a(_TC_RED) + "Interactive mode is not supported on non-Windows operating systems." + a(_T_RESET)
+                    f"""{C.RED}Interactive mode is not supported on non-Windows operating systems.{C.RESET}"""
                 )
             else:
                 print_queue.append(
-                    a(_TC_RED) + "Your Windows's version does not support interactive mode." + a(_T_RESET)
+                    f"""{C.RED}Your Windows's version does not support interactive mode.{C.RESET}"""
                 )
 
             if opt_debug:
                 print_queue.append(
-                    a(_TC_MAGENTA) + str(ex) + a(_T_RESET)
+                    f"""{C.MAGENTA}{ex}{C.RESET}"""
                 )
 
                 if ex.__cause__ is not None:
                     print_queue.append(
-                        a(_TC_MAGENTA) + str(ex.__cause__) + a(_T_RESET)
+                        f"""{C.MAGENTA}{ex.__cause__}{C.RESET}"""
                     )
         else:
             try:
                 dialog_lib.load()
             except OSError as ex:
                 print_queue.append(
-                    a(_TC_RED) + "Failed to initialize services required for dialog functionalities." + a(_T_RESET)
+                    f"""{C.RED}Failed to initialize services required for dialog functionalities.{C.RESET}"""
                 )
 
                 if opt_debug:
                     print_queue.append(
-                        a(_TC_MAGENTA) + str(ex) + a(_T_RESET)
+                        f"""{C.MAGENTA}{ex}{C.RESET}"""
                     )
 
                     if ex.__cause__ is not None:
                         print_queue.append(
-                            a(_TC_MAGENTA) + str(ex.__cause__) + a(_T_RESET)
+                            f"""{C.MAGENTA}{ex.__cause__}{C.RESET}"""
                         )
             else:
                 # Debug information.
                 if opt_debug:
                     print_queue.append(
-                        a(_TC_MAGENTA) + "Dialog library loaded." + a(_T_RESET)
+                        f"""{C.MAGENTA}Dialog library loaded.{C.RESET}"""
                     )
 
                 # Register callback to clean up COM stuff when program finishes.
@@ -262,12 +439,12 @@ if __name__ == '__main__':
                     except ValueError:
                         if opt_debug:
                             print(
-                                a(_TC_MAGENTA) + "Dialog library already unloaded." + a(_T_RESET)
+                                f"""{C.MAGENTA}Dialog library already unloaded.{C.RESET}"""
                             )
                     else:
                         if opt_debug:
                             print(
-                                a(_TC_MAGENTA) + "Dialog library unloaded." + a(_T_RESET)
+                                f"""{C.MAGENTA}Dialog library unloaded.{C.RESET}"""
                             )
 
                     print(end="\n")
@@ -276,17 +453,16 @@ if __name__ == '__main__':
 
     # -- # Main # ---------------------------------------------------------------------------------------------------- #
     # Intro.
-    print(
-        a(_TF_BOLD) + PROGRAM_NAME + a(_T_RESET),
+    out.write("\n".join((
+        f"""{C.BOLD}{PROGRAM_NAME}{C.RESET}""",
         (
-            f"""Version { a(_TF_BOLD) + PROGRAM_VER + a(_TF_NO_BOLD) }"""
+            f"""Version {C.BOLD}{PROGRAM_VER}{C.NO_BOLD}"""
             ", designed for SotES v1.2 - english Steam release."
         ), (
             f"""Running on Python { ".".join(str(_) for _ in sys.version_info[:3]) } """
-            f"""{ a(_TC_MAGENTA) + "(" + sys.prefix + ")" + a(_T_RESET) }"""
-        ),
-        sep="\n"
-    )
+            f"""{C.MAGENTA}({sys.prefix}){C.RESET}"""
+        )
+    )) + "\n")
 
     print(end="\n")
 
@@ -298,7 +474,7 @@ if __name__ == '__main__':
 
     # # Exit if interactive mode failed to start.
     if opt_interactive and dialog_lib is None:
-        exit(1)
+        sys.exit(1)
 
     # Process main arguments.
     # # Action (unpack/pack).
@@ -310,29 +486,27 @@ if __name__ == '__main__':
 
         # # Validate received value.
         try:
-            action = Action(int(action_str))
-        except ValueError:
-            print(
-                a(_TC_RED) + f"""Invalid action received: "{action_str}".""" + a(_T_RESET)
+            action = _ACTIONS_BY_VALUE[int(action_str)]
+        except (ValueError, KeyError):
+            exit_with(
+                1, f"""{C.RED}Invalid action received: "{action_str}".{C.RESET}"""
             )
-            exit(1)
     elif opt_interactive:
         # Interactive mode, no action received. Ask user.
-        print(
+        out.write("\n".join((
             "What would you like to do?",
             f"""{ Action.UNPACK.value } - Unpack SotES packed resource files into bitmaps.""",
-            f"""{ Action.PACK.value } - Pack bitmaps into SotES image resources files.""",
-            sep="\n"
-        )
+            f"""{ Action.PACK.value } - Pack bitmaps into SotES image resources files."""
+        )) + "\n")
 
         while True:
             action_str = input("==> ")
 
             try:
-                action = Action(int(action_str))
-            except ValueError:
+                action = _ACTIONS_BY_VALUE[int(action_str)]
+            except (ValueError, KeyError):
                 print(
-                    a(_TC_YELLOW) + "Invalid choice." + a(_T_RESET)
+                    f"""{C.YELLOW}Invalid choice.{C.RESET}"""
                 )
             else:
                 break
@@ -340,35 +514,35 @@ if __name__ == '__main__':
         print(end="\n")
     else:
         # Failed to receive the action.
-        print(
-            a(_TC_RED) + "No action received." + a(_T_RESET),
-            a(_TC_MAGENTA) + "This parameter is required when not in interactive mode." + a(_T_RESET),
-            sep="\n"
+        exit_with(
+            2,
+            f"""{C.RED}No action received.{C.RESET}""",
+            f"""{C.MAGENTA}This parameter is required when not in interactive mode.{C.RESET}"""
         )
-        exit(2)
 
-    if action == Action.PACK:
+    import unpacker
+
+    if action is Action.PACK:
         # Pillow required.
         if not unpacker.PIL_AVAILABLE:
-            pil_str = a(_TF_UNDER) + PILLOW_URL + a(_TF_NO_UNDER)
+            pil_str = f"""{C.UNDER}{PILLOW_URL}{C.NO_UNDER}"""
 
-            print(
-                a(_TC_MAGENTA) + f"""Packing requires the Pillow image library: { pil_str }""" + a(_T_RESET)
+            exit_with(
+                1, f"""{C.MAGENTA}Packing requires the Pillow image library: { pil_str }{C.RESET}"""
             )
-            exit(1)
 
     # # Input paths.
-    input_paths: list[pl.Path]
+    input_paths: list[str]
 
     if len(args['input-paths']) > 0:
         # Received input paths.
-        input_paths = list(pl.Path(_) for _ in args['input-paths'])
+        input_paths = args['input-paths']
     elif opt_interactive:
         # Interactive mode, no paths received. Let user choose.
         print(
             "Waiting for user to select input directory..."
         )
-        print(end="\n")
+        print(end="\n", flush=True)
 
         # Get CWD.
         try:
@@ -384,120 +558,134 @@ if __name__ == '__main__':
                 default_dir=dlg_default_dir
             )
         except OSError as ex:
-            print(
-                a(_TC_RED) + "Unexpected failure when selecting directory." + a(_T_RESET)
-            )
+            error_lines = [
+                f"""{C.RED}Unexpected failure when selecting directory.{C.RESET}"""
+            ]
 
             if opt_debug:
-                print(
-                    a(_TC_MAGENTA) + str(ex) + a(_T_RESET)
+                error_lines.append(
+                    f"""{C.MAGENTA}{ex}{C.RESET}"""
                 )
 
                 if ex.__cause__ is not None:
-                    print(
-                        a(_TC_MAGENTA) + str(ex.__cause__) + a(_T_RESET)
+                    error_lines.append(
+                        f"""{C.MAGENTA}{ex.__cause__}{C.RESET}"""
                     )
 
-            exit(1)
+            exit_with(1, *error_lines)
 
         # Process choice.
         if dialog_choice is not None:
-            input_paths = [dialog_choice]
+            input_paths = [os.fspath(dialog_choice)]
         else:
-            print(
-                a(_TC_YELLOW) + "User cancelled directory selection." + a(_T_RESET)
+            exit_with(
+                1, f"""{C.YELLOW}User cancelled directory selection.{C.RESET}"""
             )
-            exit(1)
     else:
         # Failed to receive any input paths.
-        print(
-            a(_TC_RED) + "No input paths received." + a(_T_RESET),
-            a(_TC_MAGENTA) + "This parameter is required when not in interactive mode." + a(_T_RESET),
-            sep="\n"
+        exit_with(
+            2,
+            f"""{C.RED}No input paths received.{C.RESET}""",
+            f"""{C.MAGENTA}This parameter is required when not in interactive mode.{C.RESET}"""
         )
-        exit(2)
 
     # # # Validate received paths.
-    input_files: list[pl.Path] = list()
-    seen_files: set[pl.Path] = set()
-    input_errors: dict[str, set[pl.Path]] = dict()
+    # # # # Files are kept as the path strings they were found with, which are also used as-is for display.
+    input_files: list[str] = list()
+    seen_files: set[str] = set()
+    input_errors: dict[str, list[str]] = dict()
+    seen_errors: set[tuple[str, str]] = set()
 
+    # # # # Repeated arguments would give the same results, so they are skipped before any system calls are made.
+    validated_inputs: set[str] = set()
+
+    def _record_input_error(error_msg: str, error_path: str):
+        # No duplicates, different arguments may resolve to the same path.
+        error_key = (error_msg, error_path)
+
+        if error_key not in seen_errors:
+            seen_errors.add(error_key)
+            input_errors.setdefault(error_msg, list()).append(error_path)
+
+    # # # # Paths are resolved, checked and reported as plain strings.
     for input_path in input_paths:
+        if input_path in validated_inputs:
+            continue
+
+        validated_inputs.add(input_path)
+        error_msg: str | None = None
+        error_path: str = input_path
+
         try:
-            input_path = input_path.resolve()
+            real_path = error_path = os.path.realpath(input_path)
+
+            try:
+                real_mode = os.stat(real_path).st_mode
+            except (FileNotFoundError, NotADirectoryError, ValueError):
+                real_mode = None
 
-            if input_path.is_file():
+            if real_mode is not None and stat.S_ISREG(real_mode):
                 # No duplicates.
-                if input_path not in seen_files:
-                    seen_files.add(input_path)
-                    input_files.append(input_path)
-            elif input_path.is_dir():
+                # # Paths are compared as normalized strings, which on Windows are also case-insensitive.
+                file_key = os.path.normcase(real_path)
+
+                if file_key not in seen_files:
+                    seen_files.add(file_key)
+                    input_files.append(real_path)
+            elif real_mode is not None and stat.S_ISDIR(real_mode):
                 # Look for all files in the directory.
-                for sub_path in input_path.iterdir():
-                    try:
-                        if sub_path.is_file():
-                            sub_path = sub_path.resolve()
-
-                            # No duplicates.
-                            if sub_path not in seen_files:
-                                seen_files.add(sub_path)
-                                input_files.append(sub_path)
-                    except OSError as ex:
-                        if hasattr(ex, 'winerror'):
-                            error_msg = f"""Windows Error #{ex.winerror} - {ex.strerror}:"""
-                        else:
-                            error_msg = f"""System Error #{ex.errno} - {ex.strerror}:"""
-
-                        input_errors.setdefault(error_msg, set()).add(sub_path)
+                # # The directory is already resolved and symbolic links are skipped, so entries need no resolving.
+                # # Entries that cannot be checked are reported under their own path, and the scan carries on.
+                for sub_entry in scan_files(
+                        real_path, lambda sub_path, ex: _record_input_error(make_os_err_msg(ex) + ":", sub_path)
+                ):
+                    # No duplicates.
+                    file_key = os.path.normcase(sub_entry.path)
+
+                    if file_key not in seen_files:
+                        seen_files.add(file_key)
+                        input_files.append(sub_entry.path)
             else:
-                if input_path.exists():
+                if real_mode is not None:
                     error_msg = "Error - Input path is not a file or directory:"
                 else:
                     error_msg = "Error - Input path is invalid or does not exist:"
-
-                input_errors.setdefault(error_msg, set()).add(input_path)
         except OSError as ex:
-            if hasattr(ex, 'winerror'):
-                error_msg = f"""Windows Error #{ex.winerror} - {ex.strerror}:"""
-            else:
-                error_msg = f"""System Error #{ex.errno} - {ex.strerror}:"""
+            error_msg = make_os_err_msg(ex) + ":"
 
-            input_errors.setdefault(error_msg, set()).add(input_path)
+        if error_msg is not None:
+            _record_input_error(error_msg, error_path)
 
     # # # Display received paths.
     # # # # Always build bulk messages. Printing with *args is very slow.
     if opt_debug and len(input_files) > 0:
-        print(
-            f"""Received the following {len(input_files)} files to process:""",
-            "\n".join(
-                f"""> {a(_TC_CYAN) + str(input_file) + a(_T_RESET)}"""
+        out.write("\n".join(
+            [f"""Received the following {len(input_files)} files to process:"""] + [
+                f"""> {C.CYAN}{input_file}{C.RESET}"""
                 for input_file in input_files
-            ),
-            sep="\n"
-        )
+            ]
+        ) + "\n")
 
     if len(input_errors) > 0:
         for error_msg, error_paths in sorted(input_errors.items()):
-            print(
-                a(_TC_YELLOW) + error_msg + a(_T_RESET),
-                "\n".join(
-                    f"""> {a(_TC_RED) + str(error_path) + a(_T_RESET)}"""
+            out.write("\n".join(
+                [f"""{C.YELLOW}{error_msg}{C.RESET}"""] + [
+                    f"""> {C.RED}{error_path}{C.RESET}"""
                     for error_path in sorted(error_paths)
-                ),
-                sep="\n"
-            )
+                ]
+            ) + "\n")
 
     # # # Display results.
     num_files = len(input_files)
     num_errors = sum(len(_) for _ in input_errors.values())
 
     if num_files > 0:
-        files_msg = a(_TC_CYAN) + f"""{num_files} file(s)""" + a(_T_RESET)
+        files_msg = f"""{C.CYAN}{num_files} file(s){C.RESET}"""
     else:
-        files_msg = a(_TC_RED) + "zero files" + a(_T_RESET)
+        files_msg = f"""{C.RED}zero files{C.RESET}"""
 
     if num_errors > 0:
-        errors_msg = a(_TC_YELLOW) + f"""{num_errors} error(s)""" + a(_T_RESET)
+        errors_msg = f"""{C.YELLOW}{num_errors} error(s){C.RESET}"""
     else:
         errors_msg = "zero errors"
 
@@ -507,10 +695,9 @@ if __name__ == '__main__':
 
     # # # Check if any valid paths remained.
     if len(input_files) == 0:
-        print(
-            a(_TC_RED) + "No valid files received." + a(_T_RESET)
+        exit_with(
+            1, f"""{C.RED}No valid files received.{C.RESET}"""
         )
-        exit(1)
 
     print(end="\n")
 
@@ -528,7 +715,7 @@ if __name__ == '__main__':
         print(
             "Waiting for user to select output directory..."
         )
-        print(end="\n")
+        print(end="\n", flush=True)
 
         # Get CWD.
         try:
@@ -544,38 +731,36 @@ if __name__ == '__main__':
                 default_dir=dlg_default_dir
             )
         except Exception as ex:
-            print(
-                a(_TC_RED) + "Unexpected failure when selecting directory." + a(_T_RESET)
-            )
+            error_lines = [
+                f"""{C.RED}Unexpected failure when selecting directory.{C.RESET}"""
+            ]
 
             if opt_debug:
-                print(
-                    a(_TC_MAGENTA) + str(ex) + a(_T_RESET)
+                error_lines.append(
+                    f"""{C.MAGENTA}{ex}{C.RESET}"""
                 )
 
                 if ex.__cause__ is not None:
-                    print(
-                        a(_TC_MAGENTA) + str(ex.__cause__) + a(_T_RESET)
+                    error_lines.append(
+                        f"""{C.MAGENTA}{ex.__cause__}{C.RESET}"""
                     )
 
-            exit(1)
+            exit_with(1, *error_lines)
 
         # Process choice.
         if dialog_choice is not None:
             output_dir = dialog_choice
         else:
-            print(
-                a(_TC_YELLOW) + "User cancelled directory selection." + a(_T_RESET)
+            exit_with(
+                1, f"""{C.YELLOW}User cancelled directory selection.{C.RESET}"""
             )
-            exit(1)
     else:
         # Failed to get output directory.
-        print(
-            a(_TC_RED) + "No output directory received." + a(_T_RESET),
-            a(_TC_MAGENTA) + "This parameter is required when not in interactive mode." + a(_T_RESET),
-            sep="\n"
+        exit_with(
+            2,
+            f"""{C.RED}No output directory received.{C.RESET}""",
+            f"""{C.MAGENTA}This parameter is required when not in interactive mode.{C.RESET}"""
         )
-        exit(2)
 
     # # # Validate received path.
     if output_dir is not None:
@@ -583,36 +768,30 @@ if __name__ == '__main__':
             output_dir = output_dir.resolve()
 
             if output_dir.is_dir():
-                print(
+                out.write("\n".join((
                     "Received the following output directory to save processed files in:",
-                    f"""> {a(_TC_BLUE) + str(output_dir) + a(_T_RESET)}""",
-                    sep="\n"
-                )
+                    f"""> {C.BLUE}{output_dir}{C.RESET}"""
+                )) + "\n")
             else:
                 if output_dir.exists():
                     error_msg = "The given output path is not a directory:"
                 else:
                     error_msg = "The given output directory is invalid or does not exist:"
 
-                print(
-                    a(_TC_RED) + error_msg,
-                    f"""> {str(output_dir)}""" + a(_T_RESET),
-                    sep="\n"
+                exit_with(
+                    1,
+                    f"""{C.RED}{error_msg}""",
+                    f"""> {output_dir}{C.RESET}"""
                 )
-                exit(1)
         except OSError as ex:
-            if hasattr(ex, 'winerror'):
-                error_msg = f"""Windows Error #{ex.winerror} - {ex.strerror}."""
-            else:
-                error_msg = f"""System Error #{ex.errno} - {ex.strerror}."""
+            error_msg = make_os_err_msg(ex) + "."
 
-            print(
-                a(_TC_RED) + "Failed to obtain the output directory due to the following:",
+            exit_with(
+                1,
+                f"""{C.RED}Failed to obtain the output directory due to the following:""",
                 error_msg,
-                f"""> {str(output_dir)}""" + a(_T_RESET),
-                sep="\n"
+                f"""> {output_dir}{C.RESET}"""
             )
-            exit(1)
 
     print(end="\n")
 
@@ -621,62 +800,83 @@ if __name__ == '__main__':
     print(end="\n")
 
     # # Generate all output file paths.
-    file_queue: list[tuple[pl.Path, pl.Path]] = list()
-    seen_output_files: set[pl.Path] = set()
-    queue_errors: dict[str, set[pl.Path]] = dict()
+    # # Paths are only rearranged as strings here, since no file system access is needed for it.
+    file_queue: list[tuple[str, str]] = list()
+    seen_output_files: set[str] = set()
+    queue_errors: dict[str, list[str]] = dict()
+
+    output_root = os.fspath(output_dir) if output_dir is not None else None
+
+    # # Existing files are looked up once per destination directory, instead of once per destination.
+    # # Files created after this are still refused when each file is saved.
+    existing_outputs: dict[str, set[str] | None] = dict()
 
     for input_file in input_files:
-        if output_dir is None:
+        if output_root is None:
             # Save output file next to their original file.
-            output_file = input_file.with_suffix(action.extension)
+            output_file = os.path.splitext(input_file)[0] + action.extension
         else:
             # Save output file in the output directory.
-            output_file = (output_dir / input_file.name).with_suffix(action.extension)
+            output_name = os.path.splitext(os.path.basename(input_file))[0] + action.extension
+            output_file = os.path.join(output_root, output_name)
+
+        output_key = os.path.normcase(output_file)
 
-        if output_file in seen_output_files:
+        if output_key in seen_output_files:
             error_msg = "Error - A file with the same destination is already queued."
-            queue_errors.setdefault(error_msg, set()).add(input_file)
+            queue_errors.setdefault(error_msg, list()).append(input_file)
             continue
 
         if not opt_overwrite:
+            output_parent = os.path.dirname(output_file)
+
+            if output_parent not in existing_outputs:
+                try:
+                    existing_outputs[output_parent] = scan_names(output_parent)
+                except OSError:
+                    # Fall back to checking each destination individually.
+                    existing_outputs[output_parent] = None
+
+            existing_names = existing_outputs[output_parent]
+
             try:
-                if output_file.exists():
+                if (
+                    os.path.normcase(os.path.basename(output_file)) in existing_names
+                    if existing_names is not None else
+                    os.path.lexists(output_file)
+                ):
                     error_msg = "Error - A file already exists at this file's destination."
-                    queue_errors.setdefault(error_msg, set()).add(input_file)
+                    queue_errors.setdefault(error_msg, list()).append(input_file)
                     continue
             except OSError:
                 error_msg = "Error - Could not validate this file's destination."
-                queue_errors.setdefault(error_msg, set()).add(input_file)
+                queue_errors.setdefault(error_msg, list()).append(input_file)
                 continue
 
         file_queue.append((input_file, output_file))
-        seen_output_files.add(output_file)
+        seen_output_files.add(output_key)
 
     # # Display queued files.
     if opt_debug and len(file_queue) > 0:
-        print(
-            f"""Queued the following {len(file_queue)} files:""",
-            "\n".join(
+        out.write("\n".join(
+            [f"""Queued the following {len(file_queue)} files:"""] + [
                 (
-                    f"""> {a(_TC_BLUE) + str(input_file) + a(_T_RESET)}"""
-                    f"""\n  --> {a(_TC_CYAN) + str(output_file) + a(_T_RESET)}"""
+                    f"""> {C.BLUE}{input_file}{C.RESET}"""
+                    f"""\n  --> {C.CYAN}{output_file}{C.RESET}"""
                 )
                 for (input_file, output_file) in file_queue
-            ),
-            sep="\n"
-        )
+            ]
+        ) + "\n")
         print(end="\n")
 
     if len(queue_errors) > 0:
         for error_msg, error_paths in sorted(queue_errors.items()):
-            print(
-                a(_TC_YELLOW) + error_msg + a(_T_RESET),
-                "\n".join(
-                    f"""> {a(_TC_RED) + str(error_path) + a(_T_RESET)}"""
+            out.write("\n".join(
+                [f"""{C.YELLOW}{error_msg}{C.RESET}"""] + [
+                    f"""> {C.RED}{error_path}{C.RESET}"""
                     for error_path in sorted(error_paths)
-                ),
-                sep="\n"
-            )
+                ]
+            ) + "\n")
         print(end="\n")
 
     # # Check if any valid files remained in the queue.
@@ -684,23 +884,21 @@ if __name__ == '__main__':
     num_errors = sum(len(_) for _ in queue_errors.values())
 
     if num_files == 0:
-        print(
-            a(_TC_RED) + f"""Could not queue any files, had {num_errors} queueing errors.""" + a(_T_RESET)
+        exit_with(
+            1, f"""{C.RED}Could not queue any files, had {num_errors} queueing errors.{C.RESET}"""
         )
-        exit(1)
 
     # # Display queue summary.
-    print(
-        f"""{a(_TC_CYAN) + str(num_files) + a(_T_RESET)} files successfully queued.""",
-        f"""{a(_TC_YELLOW) + str(num_errors) + a(_T_RESET)} files had errors and could not be queued."""
+    out.write("\n".join((
+        f"""{C.CYAN}{num_files}{C.RESET} files successfully queued.""",
+        f"""{C.YELLOW}{num_errors}{C.RESET} files had errors and could not be queued."""
         if num_errors > 0 else
-        a(_TC_BLUE) + "No errors queueing files." + a(_T_RESET),
+        f"""{C.BLUE}No errors queueing files.{C.RESET}""",
         f"""Action: {str(action.name).lower()}.""",
-        f"""Overwrite existing files: {a(_TC_YELLOW) + "YES" + a(_T_RESET)}"""
+        f"""Overwrite existing files: {C.YELLOW}YES{C.RESET}"""
         if opt_overwrite else
-        "Overwrite existing files: NO.",
-        sep="\n"
-    )
+        "Overwrite existing files: NO."
+    )) + "\n")
 
     print(end="\n")
 
@@ -711,97 +909,97 @@ if __name__ == '__main__':
     else:
         print("Starting...")
 
-    print(end="\n")
+    print(end="\n", flush=True)
 
     # Main process.
-    parsed_files: set[tuple[pl.Path, pl.Path]] = set()
-    parse_errors: dict[str, set[tuple[pl.Path, pl.Path]]] = dict()
+    # # Files are unique in the queue, so results are kept in lists without deduplication, and sorted once for display.
+    parsed_files: list[tuple[str, str]] = list()
+    parse_errors: dict[str, list[tuple[str, str]]] = dict()
 
     # # Print-only stuff.
-    last_update = -1
+    # # The progress bar is redrawn only at the file counts where it grows, which are worked out before processing.
+    # # The count of each bar is the smallest one reaching it, and a count reaching several bars only draws the last.
+    progress_ticks: dict[int, int] = dict()
+    for progress in range(_PROGRESS_WIDTH + 1):
+        progress_ticks[max(1, -(-progress * len(file_queue) // _PROGRESS_WIDTH))] = progress
+
+    progress_ticks_iter = iter(progress_ticks.items())
+    next_tick, next_progress = next(progress_ticks_iter)
+
+    # # Files are processed in parallel by worker processes, unless there are too few to make up for starting them.
+    with contextlib.ExitStack() as process_stack:
+        process_args = (
+            (input_file, output_file, action, opt_overwrite)
+            for input_file, output_file in file_queue
+        )
 
-    for input_index, (input_file, output_file) in enumerate(file_queue):
-        try:
-            if opt_overwrite or not output_file.exists():
-                try:
-                    output_file.write_bytes(
-                        unpacker.unpack(resource_data=input_file.read_bytes())
-                        if action == Action.UNPACK else
-                        unpacker.pack(bitmap_data=input_file.read_bytes())
-                    )
-                except unpacker.UnpackerError as ex:
-                    error_msg = f"""Un/Packer Error - {str(ex)}:"""
-                    parse_errors.setdefault(error_msg, set()).add((input_file, output_file))
-                else:
-                    parsed_files.add((input_file, output_file))
-            else:
-                error_msg = "Error - A file already exists at the target location:"
-                parse_errors.setdefault(error_msg, set()).add((input_file, output_file))
-        except OSError as ex:
-            if hasattr(ex, 'winerror'):
-                error_msg = f"""Windows Error #{ex.winerror} - {ex.strerror}:"""
-            else:
-                error_msg = f"""System Error #{ex.errno} - {ex.strerror}:"""
+        if len(file_queue) >= _PARALLEL_MIN_FILES:
+            process_pool = process_stack.enter_context(cf.ProcessPoolExecutor())
+            process_results = map_in_pool(
+                process_pool, process_file, process_args,
+                chunk_size=_PARALLEL_CHUNK_SIZE, max_pending=_PARALLEL_MAX_PENDING
+            )
+        else:
+            process_results = it.starmap(process_file, process_args)
 
-            parse_errors.setdefault(error_msg, set()).add((input_file, output_file))
+        for file_count, ((input_file, output_file), error_msg) in enumerate(zip(file_queue, process_results), 1):
+            if error_msg is None:
+                parsed_files.append((input_file, output_file))
+            else:
+                parse_errors.setdefault(error_msg, list()).append((input_file, output_file))
 
-        # Print status.
-        progress = 30 * input_index // (len(file_queue) - 1)
-        if progress > last_update:
-            last_update = progress
-            print(f"""\rProgress: [{("#" * progress).ljust(30, " ")}]""", sep="", end="")
+            # Print status.
+            if file_count == next_tick:
+                out.write(_PROGRESS_BARS[next_progress])
+                out.flush()
+                next_tick, next_progress = next(progress_ticks_iter, (0, 0))
 
     print(end="\n\n")
 
     # Finish.
     # # Print successfully processed files.
     if len(parsed_files) > 0:
-        print(
-            f"""Successfully saved the following {len(parsed_files)} files:""",
-            "\n".join(
-                f"""> {a(_TC_GREEN) + str(output_file) + a(_T_RESET)}"""
+        out.write("\n".join(
+            [f"""Successfully saved the following {len(parsed_files)} files:"""] + [
+                f"""> {C.GREEN}{output_file}{C.RESET}"""
                 for _, output_file in sorted(parsed_files)
-            ),
-            sep="\n"
-        )
+            ]
+        ) + "\n")
         print(end="\n")
 
     if len(parse_errors) > 0:
         for error_msg, error_files in sorted(parse_errors.items()):
-            print(
-                a(_TC_RED) + error_msg + a(_T_RESET),
-                "\n".join(
+            out.write("\n".join(
+                [f"""{C.RED}{error_msg}{C.RESET}"""] + [
                     (
-                        f"""> {a(_TC_RED) + str(input_file) + a(_T_RESET)}"""
-                        f"""\n  --> {a(_TC_RED) + str(output_file) + a(_T_RESET)}"""
+                        f"""> {C.RED}{input_file}{C.RESET}"""
+                        f"""\n  --> {C.RED}{output_file}{C.RESET}"""
                     )
                     for input_file, output_file in sorted(error_files)
-                ),
-                sep="\n"
-            )
+                ]
+            ) + "\n")
         print(end="\n")
 
     # # Print summary.
     num_successes = len(parsed_files)
     num_errors = sum(len(_) for _ in parse_errors.values())
 
-    print(
-        f"""Successfully parsed {a(_TC_GREEN) + str(num_successes) + " files" + a(_T_RESET)}."""
+    out.write("\n".join((
+        f"""Successfully parsed {C.GREEN}{num_successes} files{C.RESET}."""
         if num_successes > 0 else
-        a(_TC_RED) + "Failed to parse any files." + a(_T_RESET),
-        f"""Failed to parse {a(_TC_RED) + str(num_errors) + " files" + a(_T_RESET)}."""
+        f"""{C.RED}Failed to parse any files.{C.RESET}""",
+        f"""Failed to parse {C.RED}{num_errors} files{C.RESET}."""
         if num_errors > 0 else
-        a(_TC_GREEN) + "No errors while parsing!" + a(_T_RESET),
+        f"""{C.GREEN}No errors while parsing!{C.RESET}""",
         (
-            f"""{a(_TF_BOLD)}Project page: {a(_TF_UNDER)}"""
-            f"""https://github.com/Huzzahd/fortune_summoners_unpacker{a(_T_RESET)}"""
+            f"""{C.BOLD}Project page: {C.UNDER}"""
+            f"""https://github.com/Huzzahd/fortune_summoners_unpacker{C.RESET}"""
         ),
         (
-            f"""{a(_TF_BOLD)}Visit the fan-made Fortune Summoners Discord!"""
-            f""" {a(_TF_NEG)}https://discord.gg/N68c7pt{a(_T_RESET)}"""
-        ),
-        sep="\n"
-    )
+            f"""{C.BOLD}Visit the fan-made Fortune Summoners Discord!"""
+            f""" {C.NEG}https://discord.gg/N68c7pt{C.RESET}"""
+        )
+    )) + "\n")
 
     if not opt_skip:
         print("Press Enter to exit:")
@@ -809,4 +1007,4 @@ if __name__ == '__main__':
 
     print(end="\n")
 
-    exit(0)
+    sys.exit(0)
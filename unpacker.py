@@ -25,6 +25,20 @@ except ModuleNotFoundError:
 else:
     PIL_AVAILABLE = True
 
+# -- # Constants # --------------------------------------------------------------------------------------------------- #
+# Binary layouts used by SotES resources and Windows bitmaps.
+# # Compiled once, instead of parsing format strings on every call.
+_U32 = st.Struct('<I')
+_I32 = st.Struct('<i')
+_U16 = st.Struct('<H')
+
+# # Obfuscated fields of SotES resources, read together from offset 0x018: height key, then color depth @ off 0x430,
+# # validation key @ off 0x438, width key @ off 0x440, obfuscation key @ off 0x448 and pixel offset key @ off 0x450.
+_RESOURCE_HEADER = st.Struct('<I1044xH6xI4xI4xI4xI')
+
+# # Bitmap file header followed by the DIB header (BITMAPINFOHEADER), written together at the start of bitmaps.
+_BITMAP_HEADER = st.Struct('<2sL2HL' 'L2l2H2L2l2L')
+
 
 # -- # Exceptions # -------------------------------------------------------------------------------------------------- #
 class UnpackerError(Exception):
@@ -73,6 +87,8 @@ def unpack(resource_data: bytes, additional_checks: bool = True, always_include_
     resource_data : bytes
         The raw binary data of the resource to decrypt.
 
+        Any object exposing its bytes through the buffer protocol can be given instead, such as a memory-mapped file.
+
     additional_checks : bool = False
         SotES does not perform many checks to see if, after unpacking image resources, the bitmaps it gets are valid.
 
@@ -122,18 +138,22 @@ def unpack(resource_data: bytes, additional_checks: bool = True, always_include_
         # Mandatory fields require resource data to be at least this big.
         raise IncompleteSotESResourceError("Data is too small to be a packed bitmap resource.")
 
+    # # All fixed fields are read at once, and de-obfuscated as they are needed.
+    (
+        height_key_raw, img_color_depth_raw, val_key_raw, width_key_raw, obf_key, pix_off_key_raw
+    ) = _RESOURCE_HEADER.unpack_from(resource_data, 0x018)
+
     # # # There could be small quirks with subtracting the obfuscation key due to underflow.
     # # # However, afaik SotES doesn't use any such values that could cause problems.
-    obf_key     = st.unpack_from('I', buffer=resource_data, offset=0x448)[0]
-    val_key     = st.unpack_from('I', buffer=resource_data, offset=0x438)[0] - obf_key
-    pix_off_key = st.unpack_from('I', buffer=resource_data, offset=0x450)[0] - obf_key
+    val_key     = val_key_raw     - obf_key
+    pix_off_key = pix_off_key_raw - obf_key
 
     if val_key != 10001 or pix_off_key > 128:
         raise SotESResourceValidationError("Data is not a valid packed bitmap resource.")
 
     # Retrieve bitmap dimensions.
-    width_key  = st.unpack_from('I', buffer=resource_data, offset=0x440)[0] - obf_key
-    height_key = st.unpack_from('I', buffer=resource_data, offset=0x018)[0] - obf_key
+    width_key  = width_key_raw  - obf_key
+    height_key = height_key_raw - obf_key
 
     width_off  = 4 * width_key  + 0x004
     height_off = 4 * height_key + 0x420
@@ -142,8 +162,8 @@ def unpack(resource_data: bytes, additional_checks: bool = True, always_include_
         # Width and/or height values cannot be accessed.
         raise IncompleteSotESResourceError("Data is too small to be a packed bitmap resource.")
 
-    img_width  = st.unpack_from('i', buffer=resource_data, offset=width_off )[0] - obf_key
-    img_height = st.unpack_from('i', buffer=resource_data, offset=height_off)[0] - obf_key
+    img_width  = _I32.unpack_from(resource_data, width_off )[0] - obf_key
+    img_height = _I32.unpack_from(resource_data, height_off)[0] - obf_key
 
     # # Additional validation.
     if additional_checks:
@@ -154,7 +174,7 @@ def unpack(resource_data: bytes, additional_checks: bool = True, always_include_
 
     # Retrieve color depth.
     # # De-obfuscate.
-    img_color_depth = st.unpack_from('H', buffer=resource_data, offset=0x430)[0] - (obf_key & 0xFFFF)
+    img_color_depth = img_color_depth_raw - (obf_key & 0xFFFF)
 
     # # Additional validation.
     if additional_checks:
@@ -163,15 +183,16 @@ def unpack(resource_data: bytes, additional_checks: bool = True, always_include_
 
     # ---------------------------------------------------------------------------------------------------------------- #
     # Retrieve color table.
+    # # The color table is always located at offset 0x20 when present.
     if img_color_depth == 8:
-        img_color_table = resource_data[0x20:0x420]
+        img_color_table_size = 0x400
         img_num_colors = 0
     elif img_color_depth == 24:
         if not always_include_palette:
-            img_color_table = b''
+            img_color_table_size = 0x000
             img_num_colors = 0
         else:
-            img_color_table = resource_data[0x20:0x420]
+            img_color_table_size = 0x400
             img_num_colors = 256
     else:
         # # This is not expected but it might happen.
@@ -179,9 +200,8 @@ def unpack(resource_data: bytes, additional_checks: bool = True, always_include_
 
     # # Validate "alpha" channel in color table.
     if additional_checks:
-        for alpha_byte in img_color_table[3::4]:
-            if alpha_byte != 0x00:
-                raise InvalidBitmapError("Bitmap unpacked from resource data has invalid colors.")
+        if any(memoryview(resource_data)[0x23:0x20 + img_color_table_size:4]):
+            raise InvalidBitmapError("Bitmap unpacked from resource data has invalid colors.")
 
     # ---------------------------------------------------------------------------------------------------------------- #
     # Retrieve pixel array.
@@ -194,49 +214,59 @@ def unpack(resource_data: bytes, additional_checks: bool = True, always_include_
         raise IncompleteSotESResourceError("Data is too small to be a packed bitmap resource.")
 
     # # SotES only uses positive image dimensions that are multiples of 4, so pixel array rows are never padded.
-    # # The height check and padding are extra steps.
+    # # Rows are kept in the order they are stored in, for negative heights as well.
     pix_row_raw_size = img_color_depth // 8 * abs(img_width)
-    pix_row_padding = bytes((- pix_row_raw_size) % 4)  # Remainder necessary to round a row up to a multiple of 4 bytes.
-
-    pix_rows = []
-    for pix_row_i in range(abs(img_height)):
-        pix_row_off = img_pix_off + pix_row_i * pix_row_raw_size
-        pix_row = resource_data[pix_row_off:pix_row_off + pix_row_raw_size] + pix_row_padding
-        pix_rows.append(pix_row)
-
-    if abs(img_height) < 0:
-        # Rows are stored top-down instead of bottom-up.
-        pix_rows = reversed(pix_rows)
-
-    img_pix_array = b''.join(pix_rows)
+    pix_row_pad_size = (- pix_row_raw_size) % 4  # Remainder necessary to round a row up to a multiple of 4 bytes.
+    img_pix_array_size = abs(img_height) * (pix_row_raw_size + pix_row_pad_size)
 
     # ---------------------------------------------------------------------------------------------------------------- #
     # Build bitmap.
     # # SotES uses a very specific bitmap format, binary manipulation is sufficient.
-    bmp_header = st.pack(
-        '<2sL2HL',
-        b'BM',                                                    # Magic value for Windows bitmaps.
-        0x0E + 0x28 + len(img_color_table) + len(img_pix_array),  # File size.
-        0x00, 0x00,                                               # Reserved 1 and 2.
-        0x0E + 0x28 + len(img_color_table)                        # Offset to pixel array.
+    # # The whole file is allocated at once, and every part is written in place.
+    img_pix_array_off = 0x0E + 0x28 + img_color_table_size
+    bitmap_data = bytearray(img_pix_array_off + img_pix_array_size)
+
+    _BITMAP_HEADER.pack_into(
+        bitmap_data, 0x00,
+        # # Bitmap file header.
+        b'BM',                  # Magic value for Windows bitmaps.
+        len(bitmap_data),       # File size.
+        0x00, 0x00,             # Reserved 1 and 2.
+        img_pix_array_off,      # Offset to pixel array.
+        # # DIB header.
+        0x28,                   # Size of this header (BITMAPINFOHEADER).
+        abs(img_width),         # Image width in pixels.
+        abs(img_height),        # Image height in pixels.
+        0x01,                   # Number of color planes (fixed).
+        img_color_depth,        # Color depth/bit density of the image.
+        0x00,                   # Compression (uncompressed).
+        img_pix_array_size,     # Size of pixel array, in bytes.
+        0x00,                   # Preferred horizontal resolution (unimportant).
+        0x00,                   # Preferred vertical resolution (unimportant).
+        img_num_colors,         # Number of colors used in the color palette (0 = auto).
+        0x00                    # Number of important colors (unimportant).
     )
 
-    dib_header = st.pack(
-        '<L2l2H2L2l2L',
-        0x28,                # Size of this header (BITMAPINFOHEADER).
-        abs(img_width),      # Image width in pixels.
-        abs(img_height),     # Image height in pixels.
-        0x01,                # Number of color planes (fixed).
-        img_color_depth,     # Color depth/bit density of the image.
-        0x00,                # Compression (uncompressed).
-        len(img_pix_array),  # Size of pixel array, in bytes.
-        0x00,                # Preferred horizontal resolution (unimportant).
-        0x00,                # Preferred vertical resolution (unimportant).
-        img_num_colors,      # Number of colors used in the color palette (0 = auto).
-        0x00                 # Number of important colors (unimportant).
-    )
+    # # The resource is sliced through a memory view, so its parts are copied only once, straight into the bitmap.
+    # # Slices of the view are never kept, so that memory-mapped resources can be closed as soon as this returns.
+    with memoryview(resource_data) as resource_view:
+        bitmap_data[0x0E + 0x28:img_pix_array_off] = resource_view[0x20:0x20 + img_color_table_size]
 
-    return bmp_header + dib_header + img_color_table + img_pix_array
+        if pix_row_pad_size == 0:
+            # # Unpadded rows are contiguous in both formats, so the pixel array is copied whole.
+            bitmap_data[img_pix_array_off:] = resource_view[img_pix_off:img_pix_off + img_pix_array_size]
+        else:
+            # # The padding is an extra step, rows are copied one by one and their zero-filled padding is left as is.
+            pix_row_size = pix_row_raw_size + pix_row_pad_size
+
+            for pix_row_i in range(abs(img_height)):
+                pix_row_off = img_pix_off + pix_row_i * pix_row_raw_size
+                bitmap_row_off = img_pix_array_off + pix_row_i * pix_row_size
+                bitmap_data[bitmap_row_off:bitmap_row_off + pix_row_raw_size] = (
+                    resource_view[pix_row_off:pix_row_off + pix_row_raw_size]
+                )
+
+    return bytes(bitmap_data)
 
 
 def pack(bitmap_data: bytes) -> bytes:
@@ -264,36 +294,22 @@ def pack(bitmap_data: bytes) -> bytes:
             raise UnsupportedBitmapError("SotES does not support palettes with more than 256 colors.")
 
         # Build color table.
+        # # Colors are stored as BGR0 in bitmaps, so channels are laid out through strided slices of a blank table.
+        # # Colors beyond the ones in the palette stay blank.
         img_color_depth = 8
-        img_palette = b''.join(
-            st.pack(
-                '4B',
-                pil_palette[color_offset + 2],
-                pil_palette[color_offset + 1],
-                pil_palette[color_offset],
-                0x00                            # Colors stored as BGR0 in bitmaps.
-            )
-            for color_offset in range(0, len(pil_palette), 3)
-        ).ljust(0x400)
+        img_palette = bytearray(0x400)
+        pil_palette = bytes(pil_palette)
+        pil_palette_end = 4 * (len(pil_palette) // 3)
+
+        img_palette[0:pil_palette_end:4] = pil_palette[2::3]
+        img_palette[1:pil_palette_end:4] = pil_palette[1::3]
+        img_palette[2:pil_palette_end:4] = pil_palette[0::3]
 
         # Build pixel array.
         # # SotES does not pad the pixel array.
         # # Best to use only images with dimensions multiples of 4.
-        pil_pixels = list(pil_img.getdata())  # Sequence of entries into the palette (P, P, P, P...).
-        pil_row_size = img_width
-        img_pixel_rows = []
-
-        for row_index in range(img_height):
-            pil_row_offset = row_index * pil_row_size
-            img_pixel_rows.append(
-                st.pack(
-                    f"{img_width}B",
-                    *pil_pixels[pil_row_offset:pil_row_offset + pil_row_size]
-                )
-            )
-
-        # # Bitmaps usually store rows bottom-up.
-        img_pixels = b''.join(reversed(img_pixel_rows))
+        # # Pillow's raw encoder writes the palette entries with rows bottom-up, as bitmaps store them, in one pass.
+        img_pixels = pil_img.tobytes('raw', 'P', 0, -1)
     elif pil_img.mode == 'RGB':
         # Color table.
         img_color_depth = 24
@@ -302,24 +318,8 @@ def pack(bitmap_data: bytes) -> bytes:
         # Pixel array.
         # # SotES does not pad the pixel array.
         # # Best to use only images with dimensions multiples of 4.
-        pil_pixels = list(pil_img.getdata())  # [(R, G, B), (R, G, B)...].
-        pil_row_size = img_width
-        img_pixel_rows = []
-
-        for row_index in range(img_height):
-            pil_row_offset = row_index * pil_row_size
-            img_pixel_row = []
-
-            for pixel_index in range(img_width):
-                # Bitmaps store channels in BGR order.
-                img_pixel_row.extend(reversed(pil_pixels[pil_row_offset + pixel_index]))
-
-            img_pixel_rows.append(
-                st.pack(f"{3 * img_width}B", *img_pixel_row)
-            )
-
-        # # Pixel array rows are stored bottom-up.
-        img_pixels = b''.join(reversed(img_pixel_rows))
+        # # Pillow's raw encoder writes channels in BGR order and rows bottom-up, as bitmaps store them, in one pass.
+        img_pixels = pil_img.tobytes('raw', 'BGR', 0, -1)
     else:
         raise UnsupportedBitmapError("SotES only supports 8bpp and 24bpp bitmaps.")
 
@@ -330,14 +330,14 @@ def pack(bitmap_data: bytes) -> bytes:
     # Pixel array is somewhere after that.
     return b''.join((
         bytes(0x04),                    # Junk.
-        st.pack('i', img_width),        # Image width @ off 0x04 (this is not always here).
+        _I32.pack(img_width),           # Image width @ off 0x04 (this is not always here).
         bytes(0x18),                    # Junk.
         img_palette,                    # Palette @ off 0x20.
-        st.pack('i', img_height),       # Image height @ off 0x420 (this is not always here).
+        _I32.pack(img_height),          # Image height @ off 0x420 (this is not always here).
         bytes(0x0C),                    # Junk.
-        st.pack('H', img_color_depth),  # Color depth @ off 0x430.
+        _U16.pack(img_color_depth),     # Color depth @ off 0x430.
         bytes(0x06),                    # Junk.
-        st.pack('I', 10001),            # Validation key @ off 0x438.
+        _U32.pack(10001),               # Validation key @ off 0x438.
         bytes(0x1C),                    # Junk.
         img_pixels                      # Pixel array @ off 0x458 (this is not always here).
     ))
@@ -3,13 +3,25 @@
 # TODO - Reconsider dialog's owner window.
 # -- # Imports # ----------------------------------------------------------------------------------------------------- #
 # Python
+from __future__ import annotations
+
+import atexit
 import ctypes as ct
 import ctypes.wintypes as wt
-import pathlib as pl
+import functools as ft
+import queue
+import threading
+import typing as tp
+
+if tp.TYPE_CHECKING:
+    # # Only needed for annotations, pathlib is imported when a selected path is returned.
+    import pathlib as pl
 
 # -- # Constants # --------------------------------------------------------------------------------------------------- #
 # Parameter attributes for ctypes.
 # # Flag 4 is poorly documented, do not use it.
+# # Prototypes without output parameters are given no attributes at all, so that ctypes passes arguments on as is.
+# # An empty tuple is only valid for functions without parameters, COM interface functions are given None instead.
 _IN = 1
 _OUT = 2
 
@@ -33,6 +45,25 @@ _IID_FOD = _GUID(0xD57C7288, 0xD4AD, 0x4768, (0xBE, 0x02, 0x9D, 0x96, 0x95, 0x32
 _CID_SI = _GUID(0x9AC9FBE1, 0xE0A2, 0x4AD6, (0xB4, 0xEE, 0xE2, 0x12, 0x01, 0x3E, 0xA9, 0x17))
 _IID_SI = _GUID(0x43826D1E, 0xE718, 0x42EE, (0xBC, 0x55, 0xA1, 0xE2, 0x61, 0xC3, 0x7B, 0xFE))
 
+# # Windows functions take identifiers by reference (REFCLSID and REFIID), references to them are only made once.
+_REF_IID_CF = ct.byref(_IID_CF)
+
+_REF_CID_FOD = ct.byref(_CID_FOD)
+_REF_IID_FOD = ct.byref(_IID_FOD)
+
+_REF_IID_SI = ct.byref(_IID_SI)
+
+# # COM interface function prototypes take their interface identifier as a pointer, which is shared by all of them.
+_P_IID_FOD = ct.pointer(_IID_FOD)
+_P_IID_SI = ct.pointer(_IID_SI)
+
+# Interface pointer type for output parameters.
+# # ctypes converts simple types to Python integers when returning them, but not their subclasses. COM methods need
+# # interface pointers as ctypes instances, so this avoids converting them back.
+class _ComPointer(ct.c_void_p):
+    pass
+
+
 # Virtual table function indexes for COM interfaces.
 # # From ShObjIdl_core.h.
 _VTI_CF_CREATE = 3
@@ -65,6 +96,9 @@ _SI_GDN_FILESYSTEM_PATH = 0x80058000
 # Windows system error codes.
 _WE_CANCELLED = 1223
 
+# Maximum number of default directory shell items kept between dialogs.
+_SHELL_ITEM_CACHE_SIZE = 8
+
 
 # -- # Exceptions # -------------------------------------------------------------------------------------------------- #
 class DialogLibError(OSError):
@@ -80,6 +114,40 @@ class FunctionNotFoundError(DialogLibError):
 
 
 # -- # Classes # ----------------------------------------------------------------------------------------------------- #
+class _ApartmentCall:
+    """A call queued for the COM apartment thread, which keeps its outcome until the waiting thread takes it."""
+    __slots__ = ('function', 'args', 'done', 'result', 'error')
+
+    # -- # Constructor # --------------------------------------------------------------------------------------------- #
+    def __init__(self, function, *args):
+        self.function = function
+        self.args: tuple = args
+        self.done: threading.Event = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+    # -- # Methods # ------------------------------------------------------------------------------------------------- #
+    def run(self):
+        """Makes the call, must run in the COM apartment thread.
+
+        Any exception is kept instead of being raised, so that the waiting thread is always released.
+        """
+        try:
+            self.result = self.function(*self.args)
+        except BaseException as ex:
+            self.error = ex
+        finally:
+            self.done.set()
+
+    def wait(self):
+        """Waits for the call to be made, then returns its result, or raises its exception again in this thread."""
+        self.done.wait()
+
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
 class DialogLib:
     """A "library" that loads the required internals and exports dialog-related functionality on Windows.
 
@@ -104,7 +172,16 @@ class DialogLib:
         """
         # Dialog interface status.
         self._dialog_loaded: bool = False
-        self._dialog_class: wt.LPVOID | None = None
+        self._dialog_class: _ComPointer | None = None
+        self._dialog_functions_loaded: bool = False
+
+        # Shell items for default directories, by path, from least to most recently used.
+        self._shell_items: dict[str, _ComPointer] = dict()
+
+        # COM apartment thread, which owns every COM object and makes all COM calls while the library is loaded.
+        # # Calls are queued as _ApartmentCall objects, and None is queued to make the thread exit.
+        self._com_thread: threading.Thread | None = None
+        self._com_queue: queue.SimpleQueue | None = None
 
         # Get required Windows functions.
         try:
@@ -118,11 +195,10 @@ class DialogLib:
             # Get necessary functions.
             # # COM functions.
             self._CoInitializeEx = ct.WINFUNCTYPE(ct.HRESULT, wt.LPVOID, wt.DWORD)(
-                ('CoInitializeEx', ole32dll),
-                ((_IN, 'pvReserved'), (_IN, 'dwCoInit'))
+                ('CoInitializeEx', ole32dll)
             )
-            self._CoGetClassObject = ct.WINFUNCTYPE(ct.HRESULT, _GUID, wt.DWORD, wt.LPVOID, _GUID,
-                                                    ct.POINTER(wt.LPVOID))(
+            self._CoGetClassObject = ct.WINFUNCTYPE(ct.HRESULT, ct.POINTER(_GUID), wt.DWORD, wt.LPVOID,
+                                                    ct.POINTER(_GUID), ct.POINTER(_ComPointer))(
                 ('CoGetClassObject', ole32dll),
                 ((_IN, 'rclsid'), (_IN, 'dwClsContext'), (_IN, 'pvReserved'), (_IN, 'riid'), (_OUT, 'ppv'))
             )
@@ -130,74 +206,180 @@ class DialogLib:
                 ('CoUninitialize', ole32dll),
                 ()
             )
+            self._CoTaskMemFree = ct.WINFUNCTYPE(None, wt.LPVOID)(
+                ('CoTaskMemFree', ole32dll)
+            )
 
             # # Shell functions.
-            self._SHCreateItemFromParsingName = ct.WINFUNCTYPE(ct.HRESULT, wt.LPCWSTR, ct.POINTER(wt.LPVOID), _GUID,
-                                                               ct.POINTER(wt.LPVOID))(
+            self._SHCreateItemFromParsingName = ct.WINFUNCTYPE(ct.HRESULT, wt.LPCWSTR, ct.POINTER(wt.LPVOID),
+                                                               ct.POINTER(_GUID), ct.POINTER(_ComPointer))(
                 ('SHCreateItemFromParsingName', shell32dll),
                 ((_IN, 'pszPath'), (_IN, 'pbc'), (_IN, 'riid'), (_OUT, 'ppv'))
             )
 
             # # ClassFactory interface functions.
-            self._IClassFactory_CreateInstance = ct.WINFUNCTYPE(ct.HRESULT, wt.LPVOID, _GUID, ct.POINTER(wt.LPVOID))(
-                _VTI_CF_CREATE, 'CreateInstance',
-                ((_IN, 'pUnkOuter'), (_IN, 'riid'), (_OUT, 'ppvObject'))
-            )
+            # # # Only the ones needed for loading and unloading, the rest are built when a dialog is first opened.
             self._IClassFactory_Release = ct.WINFUNCTYPE(wt.ULONG)(
                 _VTI_CF_RELEASE, 'Release',
                 ()
             )
-
-            # # FileOpenDialog interface functions.
-            self._IFileOpenDialog_SetTitle = ct.WINFUNCTYPE(ct.HRESULT, wt.LPCWSTR)(
-                _VTI_FOD_TITLE, 'SetTitle',
-                ((_IN, 'pszTitle'),), ct.pointer(_IID_FOD)
-            )
-            self._IFileOpenDialog_SetOkButtonLabel = ct.WINFUNCTYPE(ct.HRESULT, wt.LPCWSTR)(
-                _VTI_FOD_OK_LABEL, 'SetOkButtonLabel',
-                ((_IN, 'pszText'),), ct.pointer(_IID_FOD)
-            )
-            self._IFileOpenDialog_SetFolder = ct.WINFUNCTYPE(ct.HRESULT, wt.LPVOID)(
-                _VTI_FOD_SET_DIR, 'SetFolder',
-                ((_IN, 'psi'),), ct.pointer(_IID_FOD)
-            )
-            self._IFileOpenDialog_GetOptions = ct.WINFUNCTYPE(ct.HRESULT, ct.POINTER(ct.c_ulong))(
-                _VTI_FOD_GET_OPT, 'GetOptions',
-                ((_OUT, 'pfos'),), ct.pointer(_IID_FOD)
-            )
-            self._IFileOpenDialog_SetOptions = ct.WINFUNCTYPE(ct.HRESULT, ct.c_ulong)(
-                _VTI_FOD_SET_OPT, 'SetOptions',
-                ((_IN, 'fos'),), ct.pointer(_IID_FOD)
-            )
-            self._IFileOpenDialog_Show = ct.WINFUNCTYPE(ct.HRESULT, wt.HWND)(
-                _VTI_FOD_SHOW, 'Show',
-                ((_IN, 'hwndOwner'),), ct.pointer(_IID_FOD)
-            )
-            self._IFileOpenDialog_GetResult = ct.WINFUNCTYPE(ct.HRESULT, ct.POINTER(wt.LPVOID))(
-                _VTI_FOD_RESULT, 'GetResult',
-                ((_OUT, 'ppsi'),), ct.pointer(_IID_FOD)
-            )
-            self._IFileOpenDialog_Release = ct.WINFUNCTYPE(wt.ULONG)(
-                _VTI_FOD_RELEASE, 'Release',
-                (), ct.pointer(_IID_FOD)
-            )
-
-            # # ShellItem interface functions.
-            self._IShellItem_GetDisplayName = ct.WINFUNCTYPE(ct.HRESULT, ct.c_ulong, ct.POINTER(wt.LPWSTR))(
-                _VTI_SI_NAME, 'GetDisplayName',
-                ((_IN, 'sigdnName'), (_OUT, 'ppszName')), ct.pointer(_IID_SI)
-            )
-            self._IShellItem_Release = ct.WINFUNCTYPE(wt.ULONG)(
-                _VTI_SI_RELEASE, 'Release',
-                (), ct.pointer(_IID_SI)
-            )
         except AttributeError as ex:
             raise FunctionNotFoundError(f"""Could not obtain the necessary function: { ex.name }.""") from ex
 
+    # -- # Magic Methods # ------------------------------------------------------------------------------------------- #
+    def __enter__(self) -> DialogLib:
+        """Loads the dialog library, see the load method."""
+        self.load()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Unloads the dialog library, see the unload method."""
+        self.unload()
+
     # -- # Methods # ------------------------------------------------------------------------------------------------- #
+    def _load_dialog_functions(self):
+        """Builds the prototypes of the COM interface functions that are only used for displaying dialogs.
+
+        These are deferred until a dialog is first opened, since applications might load this class and never open one.
+        COM interface functions are obtained by index from objects' virtual tables, so building them cannot fail.
+        """
+        # ClassFactory interface functions.
+        self._IClassFactory_CreateInstance = ct.WINFUNCTYPE(ct.HRESULT, wt.LPVOID, ct.POINTER(_GUID),
+                                                            ct.POINTER(_ComPointer))(
+            _VTI_CF_CREATE, 'CreateInstance',
+            ((_IN, 'pUnkOuter'), (_IN, 'riid'), (_OUT, 'ppvObject'))
+        )
+
+        # FileOpenDialog interface functions.
+        self._IFileOpenDialog_SetTitle = ct.WINFUNCTYPE(ct.HRESULT, wt.LPCWSTR)(
+            _VTI_FOD_TITLE, 'SetTitle',
+            None, _P_IID_FOD
+        )
+        self._IFileOpenDialog_SetOkButtonLabel = ct.WINFUNCTYPE(ct.HRESULT, wt.LPCWSTR)(
+            _VTI_FOD_OK_LABEL, 'SetOkButtonLabel',
+            None, _P_IID_FOD
+        )
+        self._IFileOpenDialog_SetFolder = ct.WINFUNCTYPE(ct.HRESULT, wt.LPVOID)(
+            _VTI_FOD_SET_DIR, 'SetFolder',
+            None, _P_IID_FOD
+        )
+        self._IFileOpenDialog_GetOptions = ct.WINFUNCTYPE(ct.HRESULT, ct.POINTER(ct.c_ulong))(
+            _VTI_FOD_GET_OPT, 'GetOptions',
+            None, _P_IID_FOD
+        )
+        self._IFileOpenDialog_SetOptions = ct.WINFUNCTYPE(ct.HRESULT, ct.c_ulong)(
+            _VTI_FOD_SET_OPT, 'SetOptions',
+            None, _P_IID_FOD
+        )
+        self._IFileOpenDialog_Show = ct.WINFUNCTYPE(ct.HRESULT, wt.HWND)(
+            _VTI_FOD_SHOW, 'Show',
+            None, _P_IID_FOD
+        )
+        self._IFileOpenDialog_GetResult = ct.WINFUNCTYPE(ct.HRESULT, ct.POINTER(wt.LPVOID))(
+            _VTI_FOD_RESULT, 'GetResult',
+            None, _P_IID_FOD
+        )
+        self._IFileOpenDialog_Release = ct.WINFUNCTYPE(wt.ULONG)(
+            _VTI_FOD_RELEASE, 'Release',
+            (), _P_IID_FOD
+        )
+
+        # ShellItem interface functions.
+        self._IShellItem_GetDisplayName = ct.WINFUNCTYPE(ct.HRESULT, ct.c_ulong, ct.POINTER(wt.LPVOID))(
+            _VTI_SI_NAME, 'GetDisplayName',
+            None, _P_IID_SI
+        )
+        self._IShellItem_Release = ct.WINFUNCTYPE(wt.ULONG)(
+            _VTI_SI_RELEASE, 'Release',
+            (), _P_IID_SI
+        )
+
+        # Output buffers for the functions above, which are written by them and reused by every call.
+        self._options_buffer = ct.c_ulong()
+        self._shell_item_buffer = wt.LPVOID()
+        self._display_name_buffer = wt.LPVOID()
+
+        self._options_ref = ct.byref(self._options_buffer)
+        self._shell_item_ref = ct.byref(self._shell_item_buffer)
+        self._display_name_ref = ct.byref(self._display_name_buffer)
+
+        self._dialog_functions_loaded = True
+
+    def _get_shell_item(self, path: str) -> _ComPointer:
+        """Auxiliary function that returns the shell item for a directory path, creating it if it isn't cached.
+
+        The cache keeps the only reference to its shell items, the least recently used one is released when it's full.
+        """
+        shell_item = self._shell_items.pop(path, None)
+        if shell_item is None:
+            shell_item = self._SHCreateItemFromParsingName(_wide_string(path), None, _REF_IID_SI)
+
+            if len(self._shell_items) >= _SHELL_ITEM_CACHE_SIZE:
+                self._IShellItem_Release(self._shell_items.pop(next(iter(self._shell_items))))
+
+        self._shell_items[path] = shell_item
+        return shell_item
+
+    def _release_shell_items(self, path: str | None = None):
+        """Auxiliary function that releases the cached shell item for the given path, or all of them if None."""
+        if path is None:
+            shell_items = list(self._shell_items.values())
+            self._shell_items.clear()
+        else:
+            shell_items = [self._shell_items.pop(path)] if path in self._shell_items else list()
+
+        for shell_item in shell_items:
+            self._IShellItem_Release(shell_item)
+
+    def _com_thread_main(self, init_call: _ApartmentCall):
+        """Auxiliary function that runs in the COM apartment thread, running queued calls until told to exit.
+
+        COM is initialized by the given call, whose outcome load() waits for, and uninitialized by this thread before it
+        exits.
+        """
+        init_call.run()
+        if init_call.error is not None:
+            return
+
+        try:
+            while (call := self._com_queue.get()) is not None:
+                call.run()
+        finally:
+            self._CoUninitialize()
+
+    def _call_in_apartment(self, function, *args):
+        """Auxiliary function that runs a function in the COM apartment thread and waits for it to finish.
+
+        Exceptions raised by the function are raised again in the calling thread.
+        """
+        call = _ApartmentCall(function, *args)
+        self._com_queue.put(call)
+        return call.wait()
+
+    def _stop_com_thread(self):
+        """Auxiliary function that makes the COM apartment thread exit, uninitializing COM, and waits for it."""
+        self._com_queue.put(None)
+        self._com_thread.join()
+        self._com_thread = None
+        self._com_queue = None
+
+    def _get_dialog_class(self):
+        """Auxiliary function that gets the Common Item Dialog class object, must run in the COM apartment thread."""
+        self._dialog_class = self._CoGetClassObject(_REF_CID_FOD, _CLS_CTX_INPROC_SERVER, None, _REF_IID_CF)
+
+    def _release_dialog_class(self):
+        """Auxiliary function that releases the cached shell items and the class object, must run in the COM apartment
+        thread."""
+        self._release_shell_items()
+        self._IClassFactory_Release(self._dialog_class)
+        self._dialog_class = None
+
     def load(self):
         """Initializes the internal Windows services that this class relies on.
 
+        COM is initialized in a single-threaded apartment on a thread owned by this instance, which makes every COM call
+        until the library is unloaded. The calling thread's COM state is never changed.
+
         Remember to unload them before exiting the application.
 
         Raises
@@ -215,15 +397,30 @@ class DialogLib:
             raise ValueError("The dialog library is already loaded.")
 
         # COM initialization.
+        # # COM is initialized in a thread owned by this instance, so the caller's threads are left untouched.
+        init_call = _ApartmentCall(self._CoInitializeEx, None, _CI_APARTMENT_THREADED | _CI_DISABLE_OLE1DDE)
+        self._com_queue = queue.SimpleQueue()
+        self._com_thread = threading.Thread(
+            target=self._com_thread_main, args=(init_call,), name='DialogLib COM', daemon=True
+        )
+        self._com_thread.start()
+
         try:
-            self._CoInitializeEx(None, _CI_APARTMENT_THREADED | _CI_DISABLE_OLE1DDE)
-        except OSError as ex:
-            raise OSError("Could not initialize the COM library.") from ex
+            init_call.wait()
+        except BaseException as ex:
+            self._com_thread.join()
+            self._com_thread = None
+            self._com_queue = None
+
+            if isinstance(ex, OSError):
+                raise OSError("Could not initialize the COM library.") from ex
+            raise
 
         # Get dialog class object.
         try:
-            self._dialog_class = wt.LPVOID(self._CoGetClassObject(_CID_FOD, _CLS_CTX_INPROC_SERVER, None, _IID_CF))
+            self._call_in_apartment(self._get_dialog_class)
         except OSError as ex:
+            self._stop_com_thread()
             raise OSError("Could not get Common Item Dialog COM class object.") from ex
         else:
             self._dialog_loaded = True
@@ -243,14 +440,14 @@ class DialogLib:
         if not self._dialog_loaded:
             raise ValueError("The dialog library is not loaded.")
 
-        # Clear dialog class object.
-        self._IClassFactory_Release(self._dialog_class)
-
-        # COM uninitialization.
-        self._CoUninitialize()
+        # Release cached shell items and class object.
+        try:
+            self._call_in_apartment(self._release_dialog_class)
+        finally:
+            # COM uninitialization, done by the thread that initialized it.
+            self._stop_com_thread()
 
-        self._dialog_class = None
-        self._dialog_loaded = False
+            self._dialog_loaded = False
 
     def open_folder_dialog(
             self,
@@ -302,73 +499,138 @@ class DialogLib:
         if not self._dialog_loaded:
             raise ValueError("The dialog library must first be loaded in order to use it's exported methods.")
 
+        if not self._dialog_functions_loaded:
+            self._load_dialog_functions()
+
+        return self._call_in_apartment(self._show_folder_dialog, title, ok_label, default_dir)
+
+    def _show_folder_dialog(
+            self,
+            title: str | None,
+            ok_label: str | None,
+            default_dir: pl.Path | None
+    ) -> pl.Path | None:
+        """Auxiliary function that sets up and displays the open directory dialog, must run in the COM apartment thread.
+
+        See open_folder_dialog for the parameters, return value and exceptions.
+        """
+        # Create dialog instance.
+        # # Showing an instance again after it's closed isn't documented as supported, so every call creates its own.
         try:
-            dialog = wt.LPVOID(self._IClassFactory_CreateInstance(self._dialog_class, None, _IID_FOD))
+            dialog = self._IClassFactory_CreateInstance(self._dialog_class, None, _REF_IID_FOD)
         except OSError as ex:
             raise OSError("Could not create dialog instance.") from ex
-        else:
-            try:
-                # Dialog setup.
-                if title is not None:
-                    try:
-                        self._IFileOpenDialog_SetTitle(dialog, title)
-                    except OSError as ex:
-                        raise OSError("Could not set dialog's title.") from ex
 
-                if ok_label is not None:
-                    try:
-                        self._IFileOpenDialog_SetOkButtonLabel(dialog, ok_label)
-                    except OSError as ex:
-                        raise OSError("Could not set dialog's OK button label.") from ex
+        try:
+            # Dialog setup.
+            # # Options are added on top of the instance's own defaults, which are read instead of assumed.
+            try:
+                self._IFileOpenDialog_GetOptions(dialog, self._options_ref)
+                flags = self._options_buffer.value | _FOS_PICK_FOLDERS | _FOS_NO_CHANGE_DIR | _FOS_FORCE_FILESYSTEM
+                self._IFileOpenDialog_SetOptions(dialog, flags)
+            except OSError as ex:
+                raise OSError("Could not set dialog configuration.") from ex
 
-                if default_dir is not None:
-                    try:
-                        default_dir = wt.LPVOID(self._SHCreateItemFromParsingName(str(default_dir), None, _IID_SI))
-                    except OSError as ex:
-                        raise OSError("Could not create the shell item for the dialog's default directory.") from ex
-                    else:
-                        try:
-                            try:
-                                self._IFileOpenDialog_SetFolder(dialog, default_dir)
-                            except OSError as ex:
-                                raise OSError("Could not set dialog's default directory.") from ex
-                        finally:
-                            self._IShellItem_Release(default_dir)
+            if title is not None:
+                try:
+                    self._IFileOpenDialog_SetTitle(dialog, _wide_string(title))
+                except OSError as ex:
+                    raise OSError("Could not set dialog's title.") from ex
 
+            if ok_label is not None:
                 try:
-                    flags = self._IFileOpenDialog_GetOptions(dialog)
-                    flags |= _FOS_PICK_FOLDERS | _FOS_NO_CHANGE_DIR | _FOS_FORCE_FILESYSTEM
-                    self._IFileOpenDialog_SetOptions(dialog, flags)
+                    self._IFileOpenDialog_SetOkButtonLabel(dialog, _wide_string(ok_label))
                 except OSError as ex:
-                    raise OSError("Could not set dialog configuration.") from ex
+                    raise OSError("Could not set dialog's OK button label.") from ex
+
+            if default_dir is not None:
+                default_dir = str(default_dir)
 
-                # Show dialog.
                 try:
-                    self._IFileOpenDialog_Show(dialog, None)
+                    default_dir_item = self._get_shell_item(default_dir)
                 except OSError as ex:
-                    if ex.winerror & 0xFFFF == _WE_CANCELLED:
-                        # User selected nothing.
-                        return None
-                    else:
-                        # Process exception like normal.
-                        raise OSError("Unexpected error while showing dialog.") from ex
-
-                # Retrieve path selected by the user.
+                    raise OSError("Could not create the shell item for the dialog's default directory.") from ex
+
                 try:
-                    shell_item = wt.LPVOID(self._IFileOpenDialog_GetResult(dialog))
+                    self._IFileOpenDialog_SetFolder(dialog, default_dir_item)
+                except OSError as ex:
+                    # # The directory might have changed since its shell item was created, so it's created again.
+                    self._release_shell_items(default_dir)
+                    raise OSError("Could not set dialog's default directory.") from ex
 
+            # Show dialog.
+            try:
+                self._IFileOpenDialog_Show(dialog, None)
+            except OSError as ex:
+                if ex.winerror & 0xFFFF == _WE_CANCELLED:
+                    # User selected nothing.
+                    return None
+                else:
+                    # Process exception like normal.
+                    raise OSError("Unexpected error while showing dialog.") from ex
+
+            # Retrieve path selected by the user.
+            try:
+                # # The buffer holding the shell item is used as the interface pointer itself until it's released.
+                self._IFileOpenDialog_GetResult(dialog, self._shell_item_ref)
+                shell_item = self._shell_item_buffer
+
+                try:
+                    # Parse selected path and return it.
+                    # # The name's memory is allocated by COM, so it's kept as a raw pointer and freed once it's copied.
+                    self._IShellItem_GetDisplayName(shell_item, _SI_GDN_FILESYSTEM_PATH, self._display_name_ref)
                     try:
-                        # Parse selected path and return it.
-                        return pl.Path(self._IShellItem_GetDisplayName(shell_item, _SI_GDN_FILESYSTEM_PATH))
+                        display_name = ct.wstring_at(self._display_name_buffer.value)
                     finally:
-                        self._IShellItem_Release(shell_item)
-                except OSError as ex:
-                    raise OSError("Could not retrieve the selected directory.") from ex
-            finally:
-                self._IFileOpenDialog_Release(dialog)
+                        self._CoTaskMemFree(self._display_name_buffer)
+
+                    import pathlib as pl
+                    return pl.Path(display_name)
+                finally:
+                    self._IShellItem_Release(shell_item)
+            except OSError as ex:
+                raise OSError("Could not retrieve the selected directory.") from ex
+        finally:
+            self._IFileOpenDialog_Release(dialog)
 
     # -- # Properties # ---------------------------------------------------------------------------------------------- #
     @property
     def is_loaded(self) -> bool:
         """Whether the dialog functionalities are currently loaded and ready for use or not."""
         return self._dialog_loaded
+
+
+# -- # Functions # --------------------------------------------------------------------------------------------------- #
+@ft.lru_cache(maxsize=1)
+def get_shared_lib() -> DialogLib:
+    """Returns a dialog library instance that is shared by the whole application, which is loaded on the first call.
+
+    COM services are then only initialized once, no matter how many parts of the application open dialogs. The shared
+    instance is unloaded when the interpreter exits, so it must not be unloaded or used as a context manager.
+
+    Raises
+    ------
+    DialogLibError
+        If the dialog library couldn't be initialized, see the DialogLib class.
+
+    OSError
+        If the dialog library couldn't be loaded, see the load method.
+
+        Failures are not cached, so the next call tries again.
+    """
+    dialog_lib = DialogLib()
+    dialog_lib.load()
+
+    atexit.register(dialog_lib.unload)
+
+    return dialog_lib
+
+
+@ft.lru_cache(maxsize=32)
+def _wide_string(string: str) -> ct.c_wchar_p:
+    """Auxiliary function that converts a string to a wide string for Windows functions.
+
+    Dialogs are usually opened with the same titles, labels and folders, so conversions are cached, and the cached
+    wide strings are passed on by ctypes without converting them again.
+    """
+    return ct.c_wchar_p(string)
@@ -1,18 +1,14 @@
 """Exports the "TerminalLib" class, which wraps terminal-related functionalities on Windows."""
-# TODO - Review last-error stuff.
 # -- # Imports # ----------------------------------------------------------------------------------------------------- #
 # Python
 import ctypes as ct
 import ctypes.wintypes as wt
+import functools as ft
 
 # -- # Constants # --------------------------------------------------------------------------------------------------- #
-# Parameter attributes for ctypes.
-# # Flag 4 is poorly documented, do not use it.
-_IN = 1
-_OUT = 2
-
 # Flags and other constants used by internal functions.
 _STD_OUTPUT_HANDLE_CODE = wt.DWORD(-11)
+_INVALID_HANDLE_VALUE = wt.HANDLE(-1).value
 
 _OUT_ENABLE_PROCESSING = 0x01
 _OUT_ENABLE_VT_PROCESSING = 0x04
@@ -53,6 +49,9 @@ class TerminalLib:
 
             This usually means that the OS's version is not supported.
         """
+        # Status attributes.
+        self._vt_enabled: bool = False  # Whether Virtual Terminal processing was already enabled by this instance.
+
         # Get required Windows functions.
         try:
             # Get necessary DLLs.
@@ -62,17 +61,15 @@ class TerminalLib:
 
         try:
             # Obtain necessary functions.
+            # # None of them have output parameters, so no parameter attributes are given and arguments pass as is.
             self._GetStdHandle = ct.WINFUNCTYPE(wt.HANDLE, wt.DWORD, use_last_error=True)(
-                ('GetStdHandle', kernel32dll),
-                ((_IN, 'nStdHandle'),)
+                ('GetStdHandle', kernel32dll)
             )
             self._GetConsoleMode = ct.WINFUNCTYPE(wt.BOOL, wt.HANDLE, wt.LPDWORD, use_last_error=True)(
-                ('GetConsoleMode', kernel32dll),
-                ((_IN, 'hConsoleHandle'), (_OUT, 'lpMode'))
+                ('GetConsoleMode', kernel32dll)
             )
             self._SetConsoleMode = ct.WINFUNCTYPE(wt.BOOL, wt.HANDLE, wt.DWORD, use_last_error=True)(
-                ('SetConsoleMode', kernel32dll),
-                ((_IN, 'hConsoleHandle'), (_IN, 'dwMode'))
+                ('SetConsoleMode', kernel32dll)
             )
         except AttributeError as ex:
             raise FunctionNotFoundError(f"""Could not obtain the necessary function: "{ ex.name }".""") from ex
@@ -93,20 +90,57 @@ class TerminalLib:
             Virtual Terminal processing or for some other unexpected reason.
 
             Inspect the exception's __cause__ for more information.
+
+        Notes
+        -----
+        The console mode is only changed once, later calls on the same instance return immediately.
+        """
+        if self._vt_enabled:
+            return
+
+        # Failures are told by each function's return value, and only then is the last error looked up.
+        console = self._stdout_handle
+
+        # # The mode is written into a buffer passed by reference, so that the function's own result can be checked.
+        console_mode = wt.DWORD()
+        _check(self._GetConsoleMode(console, ct.byref(console_mode)), "Could not get standard output mode information.")
+
+        # # The terminal or a parent process may have already enabled the required flags.
+        required_flags = _OUT_ENABLE_PROCESSING | _OUT_ENABLE_VT_PROCESSING
+        if console_mode.value & required_flags != required_flags:
+            _check(
+                self._SetConsoleMode(console, console_mode.value | required_flags),
+                "Could not set standard output mode information."
+            )
+
+        self._vt_enabled = True
+
+    # -- # Properties # ---------------------------------------------------------------------------------------------- #
+    @ft.cached_property
+    def _stdout_handle(self) -> int:
+        """The handle to the application's standard output, which is only retrieved once.
+
+        Raises
+        ------
+        RuntimeError
+            If the application does not have a standard output.
+
+        OSError
+            If the handle couldn't be retrieved.
         """
         console = self._GetStdHandle(_STD_OUTPUT_HANDLE_CODE)
-        if ct.GetLastError() != 0:
-            raise OSError("Could not retrieve handle to standard output.") from ct.WinError()
+        _check(console != _INVALID_HANDLE_VALUE, "Could not retrieve handle to standard output.")
 
-        if console == 0:
+        if console is None:
+            # Null handles are given as None.
             raise RuntimeError("Application does not have a standard output.")
 
-        console_mode = self._GetConsoleMode(console)
-        if ct.GetLastError() != 0:
-            raise OSError("Could not get standard output mode information.") from ct.WinError()
+        return console
 
-        console_mode |= _OUT_ENABLE_PROCESSING | _OUT_ENABLE_VT_PROCESSING
 
-        self._SetConsoleMode(console, console_mode)
-        if ct.GetLastError() != 0:
-            raise OSError("Could not set standard output mode information.") from ct.WinError()
+# -- # Functions # --------------------------------------------------------------------------------------------------- #
+def _check(result: int, message: str):
+    """Auxiliary function that raises an OSError with the given message if a Windows function's result is zero or
+    False, chaining the calling thread's last Windows error to it."""
+    if not result:
+        raise OSError(message) from ct.WinError(ct.get_last_error())